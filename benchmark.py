@@ -3,6 +3,7 @@ from zoneinfo import ZoneInfo  # Für Zeitzonenunterstützung (Python 3.9+)
 from orb_eph import Orb as EphemOrb  # Importiere die ephem-basierte Klasse
 from orb_sky import Orb as SkyfieldOrb  # Importiere die skyfield-basierte Klasse
 import time  # Für Zeitmessung
+import numpy as np
 
 # Zeitzone GMT+1 (CET)
 TIMEZONE = ZoneInfo("Europe/Berlin")
@@ -12,25 +13,45 @@ START_DATE = datetime.datetime(2024, 1, 1, 0, 0, 0, tzinfo=TIMEZONE)
 END_DATE = datetime.datetime(2025, 1, 1, 0, 0, 0, tzinfo=TIMEZONE)
 DELTA = datetime.timedelta(hours=1)  # Schrittgröße: eine Stunde
 
+# Methoden im Mikrosekundenbereich ohne Cache-Seiteneffekte werden mehrfach hintereinander gemessen,
+# sonst dominiert der Aufwand der Zeitmessung selbst
+REPEATS = 100
+REPEATED_METHODS = {"_phase", "_light"}
+
+
+def time_call(method, args, repeats=1):
+    """
+    Misst die mittlere Laufzeit eines Aufrufs in Sekunden
+    """
+    start_time = time.perf_counter_ns()
+    for _ in range(repeats):
+        method(*args)
+    return (time.perf_counter_ns() - start_time) / repeats / 1e9
+
 
 class BenchmarkResult:
-    def __init__(self):
+    def __init__(self, expected_calls):
+        # (Klasse, Methode) -> [vorbelegtes Array der Zeiten, Anzahl Einträge]
+        self.expected_calls = expected_calls
         self.data = {}
 
     def add_result(self, class_name, method_name, time_taken):
-        if class_name not in self.data:
-            self.data[class_name] = {}
-        if method_name not in self.data[class_name]:
-            self.data[class_name][method_name] = []
-        self.data[class_name][method_name].append(time_taken)
+        entry = self.data.get((class_name, method_name))
+        if entry is None:
+            entry = self.data[(class_name, method_name)] = [np.empty(max(self.expected_calls, 1)), 0]
+        timings, count = entry
+        if count == len(timings):
+            # mehr Aufrufe als erwartet, Array vergrößern
+            timings = entry[0] = np.resize(timings, 2 * len(timings))
+        timings[count] = time_taken
+        entry[1] = count + 1
 
     def print_results(self):
         print(f"{'Class':<15} {'Method':<20} {'Average Time (s)':<20} {'Calls':<10}")
         print("-" * 65)
-        for class_name, methods in self.data.items():
-            for method_name, timings in methods.items():
-                avg_time = sum(timings) / len(timings)
-                print(f"{class_name:<15} {method_name:<20} {avg_time:<20.6f} {len(timings):<10}")
+        for (class_name, method_name), (timings, count) in self.data.items():
+            avg_time = timings[:count].mean()
+            print(f"{class_name:<15} {method_name:<20} {avg_time:<20.6f} {count:<10}")
 
 
 def benchmark_orbs():
@@ -38,7 +59,7 @@ def benchmark_orbs():
     lon = 13.4050  # Berlin (Longitude)
     elev = 34  # Meter über dem Meeresspiegel
 
-    benchmark_result = BenchmarkResult()
+    benchmark_result = BenchmarkResult(int((END_DATE - START_DATE) / DELTA))
 
     # Initialisiere die Objekte
     ephem_orb_sun = EphemOrb('sun', lon, lat, elev)
@@ -48,6 +69,7 @@ def benchmark_orbs():
     skyfield_orb_moon = SkyfieldOrb('moon', lon, lat, elev)
 
     current_time = START_DATE
+    all_hours = []
 
     while current_time < END_DATE:
         # Benchmark für jede Methode
@@ -64,13 +86,10 @@ def benchmark_orbs():
                 ("rise_cached", (0,0,True,current_time,)),
                 ("set", (0,0,True,current_time,)),
                 ("set_cached", (0,0,True,current_time,)),
-                ("pos", (None,False,current_time,)),
             ]:
                 try:
-                    start_time = time.perf_counter()
-                    getattr(orb, method)(*args)
-                    end_time = time.perf_counter()
-                    time_taken = end_time - start_time
+                    repeats = REPEATS if method in REPEATED_METHODS else 1
+                    time_taken = time_call(getattr(orb, method), args, repeats)
 
                     benchmark_result.add_result(class_name, method, time_taken)
                 except Exception as e:
@@ -78,25 +97,33 @@ def benchmark_orbs():
 
         for class_name, orb in [
             ("EphemOrb", ephem_orb_moon),
-            ("SkyfieldOrb", skyfield_orb_moon),
         ]:
             for method, args in [
                 ("_phase", ()),
                 ("_light", ()),
             ]:
                 try:
-                    start_time = time.perf_counter()
-                    getattr(orb, method)(*args)
-                    end_time = time.perf_counter()
-                    time_taken = end_time - start_time
+                    repeats = REPEATS if method in REPEATED_METHODS else 1
+                    time_taken = time_call(getattr(orb, method), args, repeats)
 
                     benchmark_result.add_result(class_name, method, time_taken)
                 except Exception as e:
                     print(f"Fehler in {class_name}.{method} @ {current_time}: {e}")
 
         # Nächste Stunde
+        all_hours.append(current_time)
         current_time += DELTA
 
+    # Skyfield rechnet Positionen und Mondphasen für alle Stunden in einem Aufruf
+    for orb, method in [
+        (skyfield_orb_sun, "pos_batch"),
+        (skyfield_orb_moon, "_phase_batch"),
+        (skyfield_orb_moon, "_light_batch"),
+    ]:
+        time_taken = time_call(getattr(orb, method), (all_hours,))
+        # als Zeit pro Zeitpunkt ablegen, damit sie mit den Einzelaufrufen vergleichbar bleibt
+        benchmark_result.add_result("SkyfieldOrb", method, time_taken / len(all_hours))
+
     # Ergebnisse ausgeben
     benchmark_result.print_results()
 
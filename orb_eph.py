@@ -33,9 +33,10 @@ try:
 except ImportError as e:
     ephem = None  # noqa
 
-import dateutil.relativedelta
 from dateutil.tz import tzutc
 
+_ONE_DAY = datetime.timedelta(days=1)
+
 """
 This library contains a class Orb for calculating sun or moon related events.
 Currently it uses ephem for calculation of the sky bound events.
@@ -79,6 +80,8 @@ class Orb():
         self.lat = lat
         self.lon = lon
         self.elev = elev
+        # (date, 'noon'|'midnight') -> (search start, event, altitude), see _avoid_neverup()
+        self._daily_extrema_cache = dict()
 
     def get_observer_and_orb(self):
         """
@@ -128,18 +131,33 @@ class Orb():
         """
         originaldoff = doff
 
-        # Get times for noon and midnight
-        midnight = self.midnight(0, 0, dt=dt)
-        noon = self.noon(0, 0, dt=dt)
-
-        # If the altitudes are calculated from previous or next day, set the correct day for the observer query
-        noon = noon if noon >= date_utc else \
-            self.noon(0, 0, dt=date_utc + dateutil.relativedelta.relativedelta(days=1))
-        midnight = midnight if midnight >= date_utc else \
-            self.midnight(0, 0, dt=date_utc - dateutil.relativedelta.relativedelta(days=1))
-        # Get lowest and highest altitudes of the relevant day/night
-        max_altitude = self.pos(offset=None, degree=True, dt=midnight)[1] if doff <= 0 else \
-            self.pos(offset=None, degree=True, dt=noon)[1]
+        # Only the lowest altitude is needed for negative offsets and only the highest for positive ones.
+        # The extremum is searched from dt, not from date_utc which has the minute offset applied
+        if dt is not None:
+            start = ephem.Date(dt - dt.utcoffset())
+        else:
+            start = ephem.Date(datetime.datetime.utcnow() + datetime.timedelta(seconds=2))
+
+        # The next extremum stays the same until it is passed, so it is cached per day.
+        # An entry is only valid if searching from start would find the same event and
+        # that event is not before date_utc, otherwise another day has to be looked at
+        which = 'midnight' if doff <= 0 else 'noon'
+        key = (start.datetime().date(), which)
+        cached = self._daily_extrema_cache.get(key)
+        if cached is not None and cached[0] <= start < cached[1] and ephem.Date(date_utc) <= cached[1]:
+            max_altitude = cached[2]
+        else:
+            event, max_altitude = self._day_extremum(which, start)
+            if event < date_utc:
+                # If the altitudes are calculated from previous or next day, set the correct day for the observer query
+                if which == 'noon':
+                    event, max_altitude = self._day_extremum(which, date_utc + _ONE_DAY)
+                else:
+                    event, max_altitude = self._day_extremum(which, date_utc - _ONE_DAY)
+            else:
+                if len(self._daily_extrema_cache) > 4:
+                    self._daily_extrema_cache.clear()
+                self._daily_extrema_cache[key] = (start, ephem.Date(event), max_altitude)
 
         # Limit degree offset to the highest or lowest possible for the given date
         doff = max(doff, max_altitude + 0.00001) if doff < 0 else min(doff,
@@ -148,20 +166,44 @@ class Orb():
             logger.info(f"offset {originaldoff} truncated to {doff}")
         return doff
 
+    def _day_extremum(self, which, start):
+        """
+        Find the next noon or midnight together with the altitude of the orb at that time
+
+        This does the work of noon()/midnight() followed by pos() with a single observer
+
+        :param which: either 'noon' or 'midnight'
+        :type which: str
+        :param start: starting point for calculation
+        :type start: ephem.Date or datetime
+        :return: time of the event and altitude in degrees
+        :rtype: tuple
+        """
+        observer, orb = self.get_observer_and_orb()
+        next_event = observer.next_transit if which == 'noon' else observer.next_antitransit
+
+        observer.date = start
+        event = next_event(orb).datetime().replace(tzinfo=tzutc())
+
+        # Get lowest or highest altitude of the relevant day/night
+        observer.date = event
+        orb.compute(observer)
+        return event, math.degrees(orb.alt)
+
     def noon(self, doff=0, moff=0, dt=None):
         observer, orb = self.get_observer_and_orb()
         if dt is not None:
-            observer.date = dt - dt.utcoffset() - dateutil.relativedelta.relativedelta(minutes=moff)
+            observer.date = dt - dt.utcoffset() - datetime.timedelta(minutes=moff)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         else:
-            observer.date = datetime.datetime.utcnow() - dateutil.relativedelta.relativedelta(
-                minutes=moff) + dateutil.relativedelta.relativedelta(seconds=2)
+            observer.date = datetime.datetime.utcnow() - datetime.timedelta(
+                minutes=moff) + datetime.timedelta(seconds=2)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         if not doff == 0:
             doff = self._avoid_neverup(dt, date_utc, doff)
         observer.horizon = str(doff)
         next_transit = observer.next_transit(orb).datetime()
-        next_transit = next_transit + dateutil.relativedelta.relativedelta(minutes=moff)
+        next_transit = next_transit + datetime.timedelta(minutes=moff)
         next_transit = next_transit.replace(tzinfo=tzutc())
         logger.debug(f"ephem: noon for {self.orb} with doff={doff}, moff={moff}, dt={dt} will be {next_transit}")
         return next_transit
@@ -170,18 +212,18 @@ class Orb():
         observer, orb = self.get_observer_and_orb()
         if dt is not None:
             var = dt.utcoffset()
-            var2 =dateutil.relativedelta.relativedelta(minutes=moff)
-            observer.date = dt - dt.utcoffset() - dateutil.relativedelta.relativedelta(minutes=moff)
+            var2 =datetime.timedelta(minutes=moff)
+            observer.date = dt - dt.utcoffset() - datetime.timedelta(minutes=moff)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         else:
-            observer.date = datetime.datetime.utcnow() - dateutil.relativedelta.relativedelta(
-                minutes=moff) + dateutil.relativedelta.relativedelta(seconds=2)
+            observer.date = datetime.datetime.utcnow() - datetime.timedelta(
+                minutes=moff) + datetime.timedelta(seconds=2)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         if not doff == 0:
             doff = self._avoid_neverup(dt, date_utc, doff)
         observer.horizon = str(doff)
         next_antitransit = observer.next_antitransit(orb).datetime()
-        next_antitransit = next_antitransit + dateutil.relativedelta.relativedelta(minutes=moff)
+        next_antitransit = next_antitransit + datetime.timedelta(minutes=moff)
         next_antitransit = next_antitransit.replace(tzinfo=tzutc())
         logger.debug(
             f"ephem: midnight for {self.orb} with doff={doff}, moff={moff}, dt={dt} will be {next_antitransit}")
@@ -199,11 +241,11 @@ class Orb():
         observer, orb = self.get_observer_and_orb()
         # workaround if rise is 0.001 seconds in the past
         if dt is not None:
-            observer.date = dt - dt.utcoffset() - dateutil.relativedelta.relativedelta(minutes=moff)
+            observer.date = dt - dt.utcoffset() - datetime.timedelta(minutes=moff)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         else:
-            observer.date = datetime.datetime.utcnow() - dateutil.relativedelta.relativedelta(
-                minutes=moff) + dateutil.relativedelta.relativedelta(seconds=2)
+            observer.date = datetime.datetime.utcnow() - datetime.timedelta(
+                minutes=moff) + datetime.timedelta(seconds=2)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         if not doff == 0:
             doff = self._avoid_neverup(dt, date_utc, doff) * 0.99
@@ -212,7 +254,7 @@ class Orb():
             next_rising = observer.next_rising(orb, use_center=center).datetime()
         else:
             next_rising = observer.next_rising(orb).datetime()
-        next_rising = next_rising + dateutil.relativedelta.relativedelta(minutes=moff)
+        next_rising = next_rising + datetime.timedelta(minutes=moff)
         next_rising = next_rising.replace(tzinfo=tzutc())
         logger.debug(
             f"ephem: next_rising for {self.orb} with doff={doff}, moff={moff}, center={center}, dt={dt} will be {next_rising}")
@@ -230,11 +272,11 @@ class Orb():
         observer, orb = self.get_observer_and_orb()
         # workaround if set is 0.001 seconds in the past
         if dt is not None:
-            observer.date = dt - dt.utcoffset() - dateutil.relativedelta.relativedelta(minutes=moff)
+            observer.date = dt - dt.utcoffset() - datetime.timedelta(minutes=moff)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         else:
-            observer.date = datetime.datetime.utcnow() - dateutil.relativedelta.relativedelta(
-                minutes=moff) + dateutil.relativedelta.relativedelta(seconds=2)
+            observer.date = datetime.datetime.utcnow() - datetime.timedelta(
+                minutes=moff) + datetime.timedelta(seconds=2)
             date_utc = (observer.date.datetime()).replace(tzinfo=tzutc())
         # avoid NeverUp error
         if not doff == 0:
@@ -244,7 +286,7 @@ class Orb():
             next_setting = observer.next_setting(orb, use_center=center).datetime()
         else:
             next_setting = observer.next_setting(orb).datetime()
-        next_setting = next_setting + dateutil.relativedelta.relativedelta(minutes=moff)
+        next_setting = next_setting + datetime.timedelta(minutes=moff)
         next_setting = next_setting.replace(tzinfo=tzutc())
         logger.debug(
             f"ephem: next_setting for {self.orb} with doff={doff}, moff={moff}, center={center}, dt={dt} will be {next_setting}")
@@ -264,7 +306,7 @@ class Orb():
         else:
             date = dt.astimezone(datetime.UTC)
         if offset:
-            date += dateutil.relativedelta.relativedelta(minutes=offset)
+            date += datetime.timedelta(minutes=offset)
         observer.date = date
         orb.compute(observer)
         if degree:
@@ -272,32 +314,40 @@ class Orb():
         else:
             return (orb.az, orb.alt)
 
-    def _light(self, offset=None):
+    def _light(self, offset=None, dt=None):
         """
         Applies only for moon, returns fraction of lunar surface illuminated when viewed from earth
         for the current time plus an offset
         :param offset: an offset given in minutes
+        :param dt:     time for which the illumination needs to be calculated, if not given the current time will be used
         """
         observer, orb = self.get_observer_and_orb()
-        date = datetime.datetime.utcnow()
+        if dt is None:
+            date = datetime.datetime.utcnow()
+        else:
+            date = dt.astimezone(datetime.UTC)
         if offset:
-            date += dateutil.relativedelta.relativedelta(minutes=offset)
+            date += datetime.timedelta(minutes=offset)
         observer.date = date
         orb.compute(observer)
         light = int(round(orb.moon_phase * 100))
         return light
 
-    def _phase(self, offset=None):
+    def _phase(self, offset=None, dt=None):
         """
         Applies only for moon, returns the moon phase related to a cycle of approx. 29.5 days
         for the current time plus an offset
         :param offset: an offset given in minutes
+        :param dt:     time for which the phase needs to be calculated, if not given the current time will be used
         """
         observer, orb = self.get_observer_and_orb()
-        date = datetime.datetime.utcnow()
+        if dt is None:
+            date = datetime.datetime.utcnow()
+        else:
+            date = dt.astimezone(datetime.UTC)
         cycle = 29.530588861
         if offset:
-            date += dateutil.relativedelta.relativedelta(minutes=offset)
+            date += datetime.timedelta(minutes=offset)
         observer.date = date
         orb.compute(observer)
         last = ephem.previous_new_moon(observer.date)
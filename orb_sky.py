@@ -23,44 +23,229 @@
 
 import logging
 import datetime
+import time
 import math
-import bisect
+import functools
+import threading
+
+import numpy
 
 logger = logging.getLogger(__name__)
 
 try:
     from skyfield.api import Loader, wgs84, N, W, E
     from skyfield import almanac
+    from skyfield.framelib import ecliptic_frame
+    from skyfield.searchlib import find_discrete
+    from skyfield.timelib import Time
 except ImportError as e:
     logger.warning("Could not find/use skyfield!")
     raise
 
-import dateutil.relativedelta
-from dateutil.tz import tzutc
 
+_UTC = datetime.timezone.utc
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=_UTC)
+_J2000 = 2451545.0
+_ONE_MICROSECOND = 1e-6 / 86400
+
+# windows for the uncached event searches, the next event is usually found in the first one
+# a transit follows within a day, rise and set may be skipped for a day at high latitudes
+_TRANSIT_WINDOWS = (datetime.timedelta(hours=12), datetime.timedelta(hours=25), datetime.timedelta(days=2))
+_HORIZON_WINDOWS = (datetime.timedelta(hours=12), datetime.timedelta(hours=26), datetime.timedelta(days=2))
+
+
+@functools.lru_cache(maxsize=4096)
+def _altaz(ts, observer, orb, tt):
+    """
+    Compute the apparent position of a celestial body for an observer
+
+    Results are cached, callers should round tt so that nearby queries share an entry
+
+    :param ts: Skyfield timescale
+    :param observer: observer with location information
+    :param orb: celestial body
+    :param tt: terrestrial time as julian date
+    :return: tuple of azimuth and altitude in radians
+    """
+    t = ts.tt_jd(tt)
+    alt, az, _ = observer.at(t).observe(orb).apparent().altaz()
+    return az.radians, alt.radians
+
+
+@functools.lru_cache(maxsize=1024)
+def _time_from_datetime(ts, dt):
+    """
+    Convert a datetime in UTC into a Skyfield Time
 
-def _find_next_datetime(sorted_datetimes, target):
-    index = bisect.bisect_right(sorted_datetimes, target)
-    if index < len(sorted_datetimes):
-        return sorted_datetimes[index]
+    The conversion is cached as the same point in time is usually passed to several
+    methods in a row. Callers have to convert to UTC first: datetimes in the same local
+    timezone compare equal regardless of `fold`, so both instants of the repeated hour
+    at the end of daylight saving time would share one entry
+
+    :param ts: Skyfield timescale
+    :param dt: datetime in UTC
+    :return: Skyfield Time
+    """
+    return ts.from_datetime(dt)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_topos(lat, lon, elev):
+    """
+    Create the geographic position of an observer, shared by all Orbs at the same location
+
+    :param lat: latitude of observer in degrees
+    :param lon: longitude of observer in degrees
+    :param elev: elevation of observer in meters
+    :return: Skyfield GeographicPosition
+    """
+    return wgs84.latlon(latitude_degrees=lat * N, longitude_degrees=lon * E, elevation_m=elev)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_observer(earth, topos):
+    """
+    Create the observer vector sum, shared by all Orbs at the same location
+
+    Sharing the observer also lets these Orbs share the entries of the _altaz cache
+
+    :param earth: earth taken from the ephemeris
+    :param topos: geographic position of the observer
+    :return: observer with location information
+    """
+    return earth + topos
+
+
+def _moon_phase_angle(bodies, t):
+    """
+    Compute the moon phase like almanac.moon_phase() but for already resolved bodies
+
+    Sun and moon are both observed from a single position of the earth
+
+    :param bodies: tuple of earth, sun and moon taken from the ephemeris
+    :param t: Skyfield Time, may also hold an array of times
+    :return: moon phase in radians, 0 is new moon and pi is full moon
+    """
+    earth, sun, moon = bodies
+    e = earth.at(t)
+    _, mlon, _ = e.observe(moon).apparent().frame_latlon(ecliptic_frame)
+    _, slon, _ = e.observe(sun).apparent().frame_latlon(ecliptic_frame)
+    return (mlon.radians - slon.radians) % math.tau
+
+
+@functools.lru_cache(maxsize=512)
+def _moon_phase(ts, bodies, minute):
+    """
+    Compute the moon phase, cached with a resolution of one minute
+
+    The moon phase advances about 0.01 degrees per minute, so sharing the result within
+    a minute rarely matters. Within about 30 seconds of a rounding boundary the illumination
+    or the phase returned by an Orb may shift by one compared to the exact time, as used by
+    the batch methods
+
+    :param ts: Skyfield timescale
+    :param bodies: tuple of earth, sun and moon taken from the ephemeris
+    :param minute: minutes since the unix epoch
+    :return: moon phase in radians, 0 is new moon and pi is full moon
+    """
+    t = ts.from_datetime(_EPOCH + datetime.timedelta(minutes=minute))
+    return _moon_phase_angle(bodies, t)
+
+
+def _illumination(phase_angle):
+    """
+    Compute the illuminated fraction of the lunar surface from the moon phase
+
+    :param phase_angle: moon phase in radians (0 is new moon), either a scalar or a numpy array
+    :return: illuminated fraction in percent, rounded to whole numbers
+    """
+    return numpy.rint((1 - numpy.cos(phase_angle)) / 2 * 100)
+
+
+def _antitransit_ha(latitude, declination, altitude_radians):
+    """
+    Hour angle function for almanac._find to search for antitransits (midnight)
+    """
+    return math.pi
+
+
+# private Skyfield function, used the same way almanac.find_transits() does
+_almanac_find = getattr(almanac, '_find', None)
+
+
+def _find_antitransits(observer, orb, start_time, end_time):
+    """
+    Search the antitransits (midnight) of a celestial body
+
+    Skyfield offers no public function for antitransits. Its private almanac._find is used
+    as long as it exists, otherwise the sign change of the hour angle is searched with the
+    slower find_discrete()
+
+    :param observer: observer with location information
+    :param orb: celestial body
+    :param start_time: Skyfield Time to start the search
+    :param end_time: Skyfield Time to end the search
+    :return: Skyfield Time array with the antitransits
+    """
+    if _almanac_find is not None:
+        times, _ = _almanac_find(observer, orb, start_time, end_time, 0, _antitransit_ha)
+        return times
+
+    def west_of_meridian(t):
+        ha, _, _ = observer.at(t).observe(orb).apparent().hadec()
+        return ha.hours % 24 < 12
+    west_of_meridian.step_days = 0.25
+
+    times, events = find_discrete(start_time, end_time, west_of_meridian)
+    return times[events == 0]
+
+
+def _days_since_j2000(t):
+    """
+    Terrestrial time relative to J2000 in days
+
+    Subtracting the whole julian day first keeps sub-microsecond precision in a float
+
+    :param t: Skyfield Time, may also hold an array of times
+    :return: days since J2000, either a scalar or a numpy array
+    """
+    return (t.whole - _J2000) + t.tt_fraction
+
+
+class _EventCache():
+    """
+    Sorted event times as a numpy array of days since J2000 (TT)
+
+    Events found by Skyfield are stored without converting them, a datetime is only
+    created for the event returned by a query
+    """
+
+    def __init__(self, times=None):
+        self.tt = numpy.empty(0)
+        if times is not None:
+            self.extend(times)
+
+    def __len__(self):
+        return len(self.tt)
+
+    def extend(self, times):
+        # new events always follow the cached ones, so appending keeps the cache sorted
+        self.tt = numpy.concatenate((self.tt, _days_since_j2000(times)))
+
+
+def _next_event(ts, cache, target):
+    # returned datetimes are rounded to microseconds, querying at such a datetime has to skip the event
+    index = numpy.searchsorted(cache.tt, _days_since_j2000(target) + _ONE_MICROSECOND, side='right')
+    if index < len(cache.tt):
+        return ts.tt_jd(_J2000, cache.tt[index]).utc_datetime()
     else:
         return None
 
-def merge_sorted_datetimes(list1, list2):
-    merged = []
-    i = j = 0
-    # Vergleiche Elemente und füge das kleinere hinzu
-    while i < len(list1) and j < len(list2):
-        if list1[i] <= list2[j]:
-            merged.append(list1[i])
-            i += 1
-        else:
-            merged.append(list2[j])
-            j += 1
-    # Füge restliche Elemente hinzu
-    merged.extend(list1[i:])
-    merged.extend(list2[j:])
-    return merged
+def _drop_passed_events(cache, target, max_passed):
+    # drop passed events only once there are too many of them, future events are always kept
+    index = numpy.searchsorted(cache.tt, _days_since_j2000(target), side='left')
+    if index > max_passed:
+        cache.tt = cache.tt[index:]
 
 
 class Orb():
@@ -83,6 +268,33 @@ class Orb():
         `pressure` - 1010 mBar
     """
 
+    # Skyfield data is loaded only once per process and shared by all Orb instances
+    _loader = None
+    _planets = None
+    _ts = None
+    # looking up bodies in the ephemeris builds new vector sums each time, so they are resolved once
+    _bodies = None
+    _load_lock = threading.Lock()
+
+    @staticmethod
+    def _ensure_loaded():
+        """
+        Load ephemeris and timescale on first use
+
+        Orbs may be created by several threads at once, the lock makes sure all of them
+        share the same data. _planets is set last, so it marks a completed load.
+        The data is always stored on Orb itself, so subclasses share it as well
+        """
+        if Orb._planets is not None:
+            return
+        with Orb._load_lock:
+            if Orb._planets is None:
+                Orb._loader = Loader('~/.skyfield-data')
+                Orb._ts = Orb._loader.timescale()
+                planets = Orb._loader('de421.bsp')
+                Orb._bodies = {name: planets[name] for name in ('earth', 'sun', 'moon')}
+                Orb._planets = planets
+
     def __init__(self, orb, lon, lat, elev=False):
         """
         Save location and celestial body
@@ -92,186 +304,242 @@ class Orb():
         :param lat: latitude of observer in degrees
         :param elev: elevation of observer in meters
         """
+        if orb not in ('sun', 'moon'):
+            raise ValueError(f"Unknown orb {orb}, use either 'sun' or 'moon'.")
+
         self.orb_name = orb
         self.lat = lat
         self.lon = lon
         self.elev = elev
         self.rise_cache = dict()
         self.set_cache = dict()
-        self.noon_cache = []
-        self.midnight_cache = []
+        self.noon_cache = _EventCache()
+        self.midnight_cache = _EventCache()
+        # last query and resulting event per cache, see _remembered_event()
+        self._last_event = dict()
         self.max_cache_size = 2000
         self.cache_prefill_horizon = 365
 
-        # Load Skyfield data
-        # Ephemeriden laden (mit Kontext-Manager öffnen)
-        self.load = Loader('~/.skyfield-data')
-        self.planets = self.load('de421.bsp')
-        self.ts = self.load.timescale()
-        self.orb = self.planets[orb]
+        # Skyfield data is shared, see _ensure_loaded()
+        self._ensure_loaded()
+        self.load = Orb._loader
+        self.planets = Orb._planets
+        self.ts = Orb._ts
+        self.orb = Orb._bodies[orb]
 
         # Define observer's location separately as topos
-        self.topos = wgs84.latlon(latitude_degrees=self.lat * N, longitude_degrees=self.lon * E, elevation_m=self.elev)
-        self.observer = self.planets['earth'] + self.topos
-
+        self.topos = _cached_topos(self.lat, self.lon, self.elev)
+        self._earth = Orb._bodies['earth']
+        self.observer = _cached_observer(self._earth, self.topos)
+        self._observer_and_orb = (self.observer, self.orb)
+        self._moon_phase_bodies = (self._earth, Orb._bodies['sun'], Orb._bodies['moon'])
 
+        if self.orb_name == 'moon':
+            self.phase = self._phase
+            self.light = self._light
+            self.phase_batch = self._phase_batch
+            self.light_batch = self._light_batch
 
     def get_observer_and_orb(self):
         """
         Return a tuple of an instance of an observer with location information
         and a celestial body
-        Both returned objects are uniquely created to prevent errors in computation
+        Both objects are resolved once in the constructor, Skyfield computations
+        do not alter them so they can safely be reused
 
         :return: tuple of observer and celestial body
         """
-        if self.orb_name == 'moon':
-            self.phase = self._phase
-            self.light = self._light
+        return self._observer_and_orb
 
-        return self.observer, self.orb
+    def _remembered_event(self, key, dt):
+        """
+        Return the event found by the previous cached query for `key` if it is still valid
 
-    def noon_cached(self, moff=0, dt=None):
-        observer, orb = self.get_observer_and_orb()
-        date_utc = self._datetime_in_utc(dt)
+        An event found as next one after a query time is also the next event for any
+        later time up to the event itself, so consecutive queries (e.g. every hour)
+        can skip the cache lookup entirely. Without dt the current time is compared
+        as a timestamp, so no datetime needs to be created
 
-        t = self.ts.from_datetime(date_utc)
+        :param key: name of the cache, e.g. 'noon' or ('rise', doff)
+        :param dt: timezone aware time of the current query or None for the current time
+        :return: the remembered event or None
+        """
+        last = self._last_event.get(key)
+        if last is None:
+            return None
+        if dt is None:
+            if last[2] <= time.time() < last[3]:
+                return last[1]
+        elif dt.tzinfo is not None and last[0] <= dt < last[1]:
+            return last[1]
+        return None
 
-        if not self.noon_cache:
-            start_time = t
-            end_time = self.ts.from_datetime(date_utc + datetime.timedelta(days=self.cache_prefill_horizon ))
-            times = almanac.find_transits(observer, orb, start_time, end_time)
-            self.noon_cache = [time.utc_datetime() for time in times]
+    def _remember_event(self, key, date_utc, event):
+        """
+        Remember the event found by a cached query, see _remembered_event()
+        """
+        self._last_event[key] = (date_utc, event, date_utc.timestamp(), event.timestamp())
 
-        if len(self.noon_cache) > self.max_cache_size:
-            self.noon_cache = []
+    def _horizon_events(self, caches, find, doff, t):
+        """
+        Return the cached rise or set events for a horizon offset, prefilled on first use
+
+        :param caches:  dict of event caches per horizon offset, either rise_cache or set_cache
+        :param find:    Skyfield search function, either almanac.find_risings or almanac.find_settings
+        :param doff:    degrees offset for the observers horizon
+        :param t:       start time of the prefill search
+        :return:        event cache for doff
+        """
+        cache = caches.get(doff)
+        if cache is None:
+            observer, orb = self._observer_and_orb
+            times, _ = find(observer, orb, t, t + datetime.timedelta(days=self.cache_prefill_horizon), doff)
+            cache = caches[doff] = _EventCache(times)
+        return cache
+
+    def _search_events(self, find, windows, t, *args):
+        """
+        Search events of the orb starting at t, trying the given windows in turn
 
-        next_transit = _find_next_datetime(self.noon_cache, date_utc)
+        The cost of a Skyfield search grows with the length of the window, so a short window
+        is tried first and the longer ones only if it did not contain any event
 
+        :param find:    Skyfield search function like almanac.find_transits, called as find(observer, orb, start, end, *args)
+        :param windows: increasing lengths of the search window, e.g. _TRANSIT_WINDOWS
+        :param t:       start time of the search
+        :param args:    further arguments for find
+        :return:        result of find for the first window containing an event (or the last window)
+        """
+        observer, orb = self._observer_and_orb
+        for window in windows:
+            result = find(observer, orb, t, t + window, *args)
+            times = result[0] if isinstance(result, tuple) else result
+            if len(times):
+                break
+        return result
+
+    def noon_cached(self, moff=0, dt=None):
+        observer, orb = self._observer_and_orb
+
+        next_transit = self._remembered_event('noon', dt)
         if next_transit is None:
-            start_time = t
-            end_time = self.ts.from_datetime(date_utc + datetime.timedelta(days=self.cache_prefill_horizon))
-            times = almanac.find_transits(observer, orb, start_time, end_time)
-            new_times = [time.utc_datetime() for time in times]
-            self.noon_cache = merge_sorted_datetimes(self.noon_cache, new_times)
-            if times:
-                next_transit = times[0].utc_datetime()
-            else:
-                raise ValueError("No transit found.")
-
-        next_transit += dateutil.relativedelta.relativedelta(minutes=moff)
+            date_utc = self._datetime_in_utc(dt)
+            t = _time_from_datetime(self.ts, date_utc)
+            if not self.noon_cache:
+                end_time = t + datetime.timedelta(days=self.cache_prefill_horizon)
+                times = almanac.find_transits(observer, orb, t, end_time)
+                self.noon_cache = _EventCache(times)
+
+            _drop_passed_events(self.noon_cache, t, self.max_cache_size // 2)
+
+            next_transit = _next_event(self.ts, self.noon_cache, t)
+
+            if next_transit is None:
+                end_time = t + datetime.timedelta(days=self.cache_prefill_horizon)
+                times = almanac.find_transits(observer, orb, t, end_time)
+                # all cached events are passed at this point
+                self.noon_cache.extend(times)
+                if times:
+                    next_transit = times[0].utc_datetime()
+                else:
+                    raise ValueError("No transit found.")
+            self._remember_event('noon', date_utc, next_transit)
+
+        next_transit += datetime.timedelta(minutes=moff)
         logger.debug(f"skyfield: noon (cached) for {self.orb} with moff={moff}, dt={dt} will be {next_transit}")
         return next_transit
 
     def noon(self, moff=0, dt=None):
-        observer, orb = self.get_observer_and_orb()
         date_utc = self._datetime_in_utc(dt)
 
-        t = self.ts.from_datetime(date_utc)
+        t = _time_from_datetime(self.ts, date_utc)
 
         # Finde den nächsten Transit
-        start_time = t
-        end_time = self.ts.from_datetime(date_utc + datetime.timedelta(days=2))  # Suche im nächsten Tag
-
-        times = almanac.find_transits(observer, orb, start_time, end_time)
+        times = self._search_events(almanac.find_transits, _TRANSIT_WINDOWS, t)
 
         if times:
             next_transit = times[0].utc_datetime()
         else:
             raise ValueError("No transit found.")
 
-        next_transit = next_transit + dateutil.relativedelta.relativedelta(minutes=moff)
-        next_transit = next_transit.astimezone(datetime.UTC)
+        next_transit = next_transit + datetime.timedelta(minutes=moff)
         logger.debug(f"skyfield: noon for {self.orb} with moff={moff}, dt={dt} will be {next_transit}")
         return next_transit
 
     def midnight_cached(self, moff=0, dt=None):
-        observer, orb = self.get_observer_and_orb()
-        date_utc = self._datetime_in_utc(dt)
-
-        t = self.ts.from_datetime(date_utc)
-
-        if not self.midnight_cache:
-            start_time = t
-            end_time = self.ts.from_datetime(date_utc + datetime.timedelta(days=self.cache_prefill_horizon))
+        observer, orb = self._observer_and_orb
 
-            def _transit_ha(latitude, declination, altitude_radians):
-                return math.pi
-
-            times, _ = almanac._find(observer, orb, start_time, end_time, 0, _transit_ha)
-            self.midnight_cache = [time.utc_datetime() for time in times]
+        next_antitransit = self._remembered_event('midnight', dt)
+        if next_antitransit is None:
+            date_utc = self._datetime_in_utc(dt)
+            t = _time_from_datetime(self.ts, date_utc)
+            if not self.midnight_cache:
+                end_time = t + datetime.timedelta(days=self.cache_prefill_horizon)
 
-        if len(self.midnight_cache) > self.max_cache_size:
-            self.midnight_cache = []
+                times = _find_antitransits(observer, orb, t, end_time)
+                self.midnight_cache = _EventCache(times)
 
-        next_antitransit = _find_next_datetime(self.midnight_cache, date_utc)
+            _drop_passed_events(self.midnight_cache, t, self.max_cache_size // 2)
 
-        if next_antitransit is None:
-            start_time = t
-            end_time = self.ts.from_datetime(date_utc + datetime.timedelta(days=self.cache_prefill_horizon))
+            next_antitransit = _next_event(self.ts, self.midnight_cache, t)
 
-            def _transit_ha(latitude, declination, altitude_radians):
-                return math.pi
+            if next_antitransit is None:
+                end_time = t + datetime.timedelta(days=self.cache_prefill_horizon)
 
-            times, _ = almanac._find(observer, orb, start_time, end_time, 0, _transit_ha)
-            new_times = [time.utc_datetime() for time in times]
-            self.midnight_cache = merge_sorted_datetimes(self.midnight_cache, new_times)
-            if times:
-                next_antitransit = times[0].utc_datetime()
-            else:
-                raise ValueError("No antitransit found.")
+                times = _find_antitransits(observer, orb, t, end_time)
+                # all cached events are passed at this point
+                self.midnight_cache.extend(times)
+                if times:
+                    next_antitransit = times[0].utc_datetime()
+                else:
+                    raise ValueError("No antitransit found.")
+            self._remember_event('midnight', date_utc, next_antitransit)
 
-        next_antitransit += dateutil.relativedelta.relativedelta(minutes=moff)
+        next_antitransit += datetime.timedelta(minutes=moff)
         logger.debug(f"skyfield: midnight (cached) for {self.orb} with moff={moff}, dt={dt} will be {next_antitransit}")
         return next_antitransit
 
     def midnight(self, moff=0, dt=None):
-        observer, orb = self.get_observer_and_orb()
         date_utc = self._datetime_in_utc(dt)
 
-        t = self.ts.from_datetime(date_utc)
-
-        start_time = t
-        end_time = self.ts.from_datetime(date_utc + datetime.timedelta(days=2))  # Suche im nächsten Tag
+        t = _time_from_datetime(self.ts, date_utc)
 
-        def _transit_ha(latitude, declination, altitude_radians):
-            return math.pi
-        times, _ = almanac._find(observer, orb, start_time, end_time, 0, _transit_ha)
+        times = self._search_events(_find_antitransits, _TRANSIT_WINDOWS, t)
 
         if times:
             next_antitransit = times[0].utc_datetime()
         else:
             raise ValueError("No antitransit found.")
 
-        next_antitransit = next_antitransit + dateutil.relativedelta.relativedelta(minutes=moff)
-        next_antitransit = next_antitransit.astimezone(datetime.UTC)
+        next_antitransit = next_antitransit + datetime.timedelta(minutes=moff)
         logger.debug(
             f"skyfield: midnight for {self.orb} with moff={moff}, dt={dt} will be {next_antitransit}")
         return next_antitransit
 
     def rise_cached(self, doff=0, moff=0, center=True, dt=None):
-        observer, orb = self.get_observer_and_orb()
-        date_utc = self._datetime_in_utc(dt)
+        observer, orb = self._observer_and_orb
 
-        t = self.ts.from_datetime(date_utc)
-        if doff not in self.rise_cache:
-            times, events = almanac.find_risings(observer, orb, t, t + datetime.timedelta(days=self.cache_prefill_horizon), doff)
-            self.rise_cache[doff] = [time.utc_datetime() for time in times]
+        next_rise = self._remembered_event(('rise', doff), dt)
+        if next_rise is None:
+            date_utc = self._datetime_in_utc(dt)
+            t = _time_from_datetime(self.ts, date_utc)
+            cache = self._horizon_events(self.rise_cache, almanac.find_risings, doff, t)
 
-        if len(self.rise_cache[doff]) > self.max_cache_size:
-            self.rise_cache[doff] = []
+            _drop_passed_events(cache, t, self.max_cache_size // 2)
 
-        next_rise = _find_next_datetime(self.rise_cache[doff], date_utc)
+            next_rise = _next_event(self.ts, cache, t)
 
-        if next_rise is None:
-            times, events = almanac.find_risings(observer, orb, t, t + datetime.timedelta(days=self.cache_prefill_horizon), doff)
-            new_times = [time.utc_datetime() for time in times]
-            self.rise_cache[doff] = merge_sorted_datetimes(self.rise_cache[doff], new_times)
-            if times:
-                next_rise = times[0].utc_datetime()
-            else:
-                raise ValueError("No rise found.")
-
-        next_rise += dateutil.relativedelta.relativedelta(minutes=moff)
+            if next_rise is None:
+                times, events = almanac.find_risings(observer, orb, t, t + datetime.timedelta(days=self.cache_prefill_horizon), doff)
+                # all cached events are passed at this point
+                cache.extend(times)
+                if times:
+                    next_rise = times[0].utc_datetime()
+                else:
+                    raise ValueError("No rise found.")
+            self._remember_event(('rise', doff), date_utc, next_rise)
+
+        next_rise += datetime.timedelta(minutes=moff)
         logger.debug(
             f"skyfield: next_rise for {self.orb} with doff={doff}, moff={moff}, center={center}, dt={dt} will be {next_rise}")
         return next_rise
@@ -281,57 +549,74 @@ class Orb():
         Computes the rise of either sun or moon
         :param doff:    degrees offset for the observers horizon
         :param moff:    minutes offset from time of rise (either before or after)
-        :param center:  if True then the centerpoint of either sun or moon will be considered to make the transit otherwise the upper limb will be considered
+        :param center:  not used, Skyfield always considers the centerpoint of either sun or moon; kept for compatibility with the ephem based Orb
         :param dt:      start time for the search for a rise, if not given the current time will be used
         :return:
         """
-        observer, orb = self.get_observer_and_orb()
         date_utc = self._datetime_in_utc(dt)
 
-        t = self.ts.from_datetime(date_utc)
-
-        times, events = almanac.find_risings(observer, orb, t, t + datetime.timedelta(days=2), doff)
-        next_rising = None
+        t = _time_from_datetime(self.ts, date_utc)
 
-        for time, event in zip(times, events):
-            if not event:  # True = Aufgang
-                logger.info("No rise found, returned time is transit time instead")
-            next_rising = time.utc_datetime()
-            break
+        times, events = self._search_events(almanac.find_risings, _HORIZON_WINDOWS, t, doff)
 
-        if next_rising is None:
+        if len(times) == 0:
             # should not happen
             raise ValueError("No rise found.")
 
-        next_rising = next_rising + dateutil.relativedelta.relativedelta(minutes=moff)
+        # the first event is returned, even if it is no rise
+        if not events[0]:  # True = Aufgang
+            logger.info("No rise found, returned time is transit time instead")
+        next_rising = times[0].utc_datetime()
+
+        next_rising = next_rising + datetime.timedelta(minutes=moff)
         logger.debug(
             f"skyfield: next_rising for {self.orb} with doff={doff}, moff={moff}, center={center}, dt={dt} will be {next_rising}")
         return next_rising
 
+    def rise_batch(self, dts, doff=0, moff=0):
+        """
+        Computes the next rise of either sun or moon for many points in time at once
+        :param dts:     sequence of timezone aware datetimes, a numpy datetime64 array in UTC or a Skyfield Time array, for each the next rise is searched
+        :param doff:    degrees offset for the observers horizon
+        :param moff:    minutes offset from time of rise (either before or after)
+        :return:        list with the next rise for each entry of dts
+        """
+        return self._next_events_batch(almanac.find_risings, dts, doff, moff, "No rise found.")
+
+    def set_batch(self, dts, doff=0, moff=0):
+        """
+        Computes the next setting of either sun or moon for many points in time at once
+        :param dts:     sequence of timezone aware datetimes, a numpy datetime64 array in UTC or a Skyfield Time array, for each the next setting is searched
+        :param doff:    degrees offset for the observers horizon
+        :param moff:    minutes offset from time of setting (either before or after)
+        :return:        list with the next setting for each entry of dts
+        """
+        return self._next_events_batch(almanac.find_settings, dts, doff, moff, "No set found.")
+
     def set_cached(self, doff=0, moff=0, center=True, dt=None):
-        observer, orb = self.get_observer_and_orb()
-        date_utc = self._datetime_in_utc(dt)
+        observer, orb = self._observer_and_orb
+
+        next_set = self._remembered_event(('set', doff), dt)
+        if next_set is None:
+            date_utc = self._datetime_in_utc(dt)
+            t = _time_from_datetime(self.ts, date_utc)
+            cache = self._horizon_events(self.set_cache, almanac.find_settings, doff, t)
 
-        t = self.ts.from_datetime(date_utc)
-        if doff not in self.set_cache:
-            times, events = almanac.find_settings(observer, orb, t, t + datetime.timedelta(days=self.cache_prefill_horizon), doff)
-            self.set_cache[doff] = [time.utc_datetime() for time in times]
+            _drop_passed_events(cache, t, self.max_cache_size // 2)
 
-        if len(self.set_cache.get(doff, [])) > self.max_cache_size:
-            self.set_cache[doff] = []
+            next_set = _next_event(self.ts, cache, t)
 
-        next_set = _find_next_datetime(self.set_cache.get(doff, []), date_utc)
+            if next_set is None:
+                times, events = almanac.find_settings(observer, orb, t, t + datetime.timedelta(days=self.cache_prefill_horizon), doff)
+                # all cached events are passed at this point
+                cache.extend(times)
+                if times:
+                    next_set = times[0].utc_datetime()
+                else:
+                    raise ValueError("No set found.")
+            self._remember_event(('set', doff), date_utc, next_set)
 
-        if next_set is None:
-            times, events = almanac.find_settings(observer, orb, t, t + datetime.timedelta(days=self.cache_prefill_horizon), doff)
-            new_times = [time.utc_datetime() for time in times]
-            self.set_cache[doff] = merge_sorted_datetimes(self.set_cache.get(doff, []), new_times)
-            if times:
-                next_set = times[0].utc_datetime()
-            else:
-                raise ValueError("No set found.")
-
-        next_set += dateutil.relativedelta.relativedelta(minutes=moff)
+        next_set += datetime.timedelta(minutes=moff)
         logger.debug(
             f"skyfield: next_set (cached) for {self.orb} with doff={doff}, moff={moff}, dt={dt} will be {next_set}")
         return next_set
@@ -341,29 +626,26 @@ class Orb():
         Computes the setting of either sun or moon
         :param doff:    degrees offset for the observers horizon
         :param moff:    minutes offset from time of setting (either before or after)
-        :param center:  if True then the centerpoint of either sun or moon will be considered to make the transit otherwise the upper limb will be considered
+        :param center:  not used, Skyfield always considers the centerpoint of either sun or moon; kept for compatibility with the ephem based Orb
         :param dt:      start time for the search for a setting, if not given the current time will be used
         :return:
         """
-        observer, orb = self.get_observer_and_orb()
         date_utc = self._datetime_in_utc(dt)
 
-        t = self.ts.from_datetime(date_utc)
+        t = _time_from_datetime(self.ts, date_utc)
 
         # Verwende almanac.risings_and_settings, um das nächste Set-Ereignis zu berechnen
-        times, events = almanac.find_settings(observer, orb, t, t + datetime.timedelta(days=2),doff)
-
-        next_setting = None
-        for time, event in zip(times, events):
-            if not event:  # True = Aufgang
-                logger.info("No setting found, returned time is transit time instead")
-            next_setting = time.utc_datetime()
-            break
+        times, events = self._search_events(almanac.find_settings, _HORIZON_WINDOWS, t, doff)
 
-        if next_setting is None:
+        if len(times) == 0:
             raise ValueError("No set found.")
 
-        next_setting = next_setting + dateutil.relativedelta.relativedelta(minutes=moff)
+        # the first event is returned, even if it is no setting
+        if not events[0]:  # True = Untergang
+            logger.info("No setting found, returned time is transit time instead")
+        next_setting = times[0].utc_datetime()
+
+        next_setting = next_setting + datetime.timedelta(minutes=moff)
         logger.debug(
             f"skyfield: next_setting for {self.orb} with doff={doff}, moff={moff}, center={center}, dt={dt} will be {next_setting}")
         return next_setting
@@ -376,59 +658,155 @@ class Orb():
         :param dt:      time for which the position needs to be calculated
         :return:        a tuple with azimuth and elevation
         """
-        observer, orb = self.get_observer_and_orb()
-        date_utc = self._datetime_in_utc(dt)
+        observer, orb = self._observer_and_orb
+        t = _time_from_datetime(self.ts, self._datetime_in_utc(dt))
         if offset:
-            date_utc += dateutil.relativedelta.relativedelta(minutes=offset)
+            t += datetime.timedelta(minutes=offset)
 
-        t = self.ts.from_datetime(date_utc)
-        astrometric = observer.at(t).observe(orb)
-        alt, az, _ = astrometric.apparent().altaz()
+        # rounding to 1e-7 days (below 0.01 seconds) lets repeated queries hit the cache
+        az, alt = _altaz(self.ts, observer, orb, round(t.tt, 7))
 
         if degree:
-            return (az.degrees, alt.degrees)
+            return (math.degrees(az), math.degrees(alt))
+        else:
+            return (az, alt)
+
+    def pos_batch(self, dts, degree=False):
+        """
+        Calculates the positions of either sun or moon for many points in time at once
+        :param dts:     sequence of timezone aware datetimes, a numpy datetime64 array in UTC or a Skyfield Time array
+        :param degree:  if True: return the positions as degrees, otherwise as radians
+        :return:        a tuple with arrays of azimuth and elevation
+        """
+        observer, orb = self._observer_and_orb
+        t = self._times(dts)
+        alt, az, _ = observer.at(t).observe(orb).apparent().altaz()
+
+        if degree:
+            return (numpy.degrees(az.radians), numpy.degrees(alt.radians))
         else:
             return (az.radians, alt.radians)
 
-    def _light(self, offset=None):
+    def _light(self, offset=None, dt=None):
         """
         Applies only for moon, returns fraction of lunar surface illuminated when viewed from earth
         for the current time plus an offset
         :param offset: an offset given in minutes
+        :param dt:     time for which the illumination needs to be calculated, if not given the current time will be used
         """
-        date = datetime.datetime.now(datetime.UTC)  # UTC-Zeit mit Zeitzoneninformation
+        minute = self._datetime_or_now(dt).timestamp() / 60
         if offset:
-            date += dateutil.relativedelta.relativedelta(minutes=offset)
-
-        t = self.ts.from_datetime(date)  # Konvertiere datetime in Skyfield-Zeit
+            minute += offset
 
         # Berechne den Phasenwinkel zwischen Mond und Sonne
-        phase_angle = almanac.moon_phase(self.planets, t).radians
+        phase_angle = _moon_phase(self.ts, self._moon_phase_bodies, round(minute))
 
         # Berechne den beleuchteten Anteil der Mondoberfläche
-        light = (1 - math.cos(phase_angle)) / 2 * 100
-        return int(round(light))
+        return int(_illumination(phase_angle))
 
 
-    def _phase(self, offset=None):
+    def _phase(self, offset=None, dt=None):
         """
         Applies only for moon, returns the moon phase related to a cycle of approx. 29.5 days
         for the current time plus an offset
         :param offset: an offset given in minutes
+        :param dt:     time for which the phase needs to be calculated, if not given the current time will be used
         """
-        date = datetime.datetime.now(datetime.UTC) # UTC-Zeit mit Zeitzoneninformation
+        minute = self._datetime_or_now(dt).timestamp() / 60
         if offset:
-            date += dateutil.relativedelta.relativedelta(minutes=offset)
-
-        t = self.ts.from_datetime(date)  # Konvertiere datetime in Skyfield-Zeit
+            minute += offset
 
         # Berechne den Phasenwinkel zwischen Mond und Sonne
-        phase_angle = almanac.moon_phase(self.planets, t).degrees
-        phase = (phase_angle / 360 * 8)
+        phase_angle = _moon_phase(self.ts, self._moon_phase_bodies, round(minute))
+        phase = (phase_angle / math.tau * 8)
         return int(round(phase))
 
+    def _light_batch(self, dts):
+        """
+        Applies only for moon, returns fractions of lunar surface illuminated when viewed from earth
+        for many points in time at once
+        :param dts: sequence of timezone aware datetimes, a numpy datetime64 array in UTC or a Skyfield Time array
+        :return:    numpy array with the illuminated fractions in percent
+        """
+        phase_angle = _moon_phase_angle(self._moon_phase_bodies, self._times(dts))
+        return _illumination(phase_angle).astype(int)
+
+    def _phase_batch(self, dts):
+        """
+        Applies only for moon, returns the moon phases related to a cycle of approx. 29.5 days
+        for many points in time at once
+        :param dts: sequence of timezone aware datetimes, a numpy datetime64 array in UTC or a Skyfield Time array
+        :return:    numpy array with the moon phases
+        """
+        phase_angle = _moon_phase_angle(self._moon_phase_bodies, self._times(dts))
+        return numpy.rint(phase_angle / math.tau * 8).astype(int)
+
+    def _next_events_batch(self, find, dts, doff, moff, error):
+        """
+        Search the next event after each of many points in time with a single Skyfield search
+        :param find:    Skyfield search function like almanac.find_risings
+        :param dts:     sequence of timezone aware datetimes, a numpy datetime64 array in UTC or a Skyfield Time array
+        :param doff:    degrees offset for the observers horizon
+        :param moff:    minutes offset added to each event
+        :param error:   message of the ValueError raised if an event can not be found
+        :return:        list with the next event for each entry of dts
+        """
+        observer, orb = self._observer_and_orb
+        t = self._times(dts)
+        if len(t.tt) == 0:
+            return []
+
+        # one search spanning all points in time plus the longest window of the single searches
+        start_time = self.ts.tt_jd(t.tt.min())
+        end_time = self.ts.tt_jd(t.tt.max()) + _HORIZON_WINDOWS[-1]
+        times, _ = find(observer, orb, start_time, end_time, doff)
+
+        index = numpy.searchsorted(times.tt, t.tt)
+        if index.max() >= len(times.tt):
+            raise ValueError(error)
+
+        offset = datetime.timedelta(minutes=moff)
+        return [event + offset for event in times[index].utc_datetime()]
+
+    def _times(self, dts):
+        """
+        Convert a sequence of timezone aware datetimes into a single Skyfield time array
+        :param dts: sequence of timezone aware datetimes, a numpy datetime64 array in UTC or a Skyfield Time array
+        :return:    Skyfield Time holding all given points in time
+        """
+        if isinstance(dts, Time):
+            return dts
+        if isinstance(dts, numpy.ndarray) and dts.dtype.kind == 'M':
+            # numpy datetime64 values carry no timezone and are taken as UTC
+            nanoseconds = dts.astype('datetime64[ns]').astype(numpy.int64)
+            days, nanoseconds = numpy.divmod(nanoseconds, 86400 * 10**9)
+            return self.ts.utc(1970, 1, 1 + days, 0, 0, nanoseconds / 1e9)
+        seconds = numpy.fromiter((dt.timestamp() for dt in dts), dtype=float)
+        # split into whole days so the leap second table is consulted for the right day
+        days, seconds = numpy.divmod(seconds, 86400.0)
+        return self.ts.utc(1970, 1, 1 + days, 0, 0, seconds)
+
+    def _datetime_or_now(self, dt):
+        """
+        Return dt unchanged, the current time is only read when no dt is given
+
+        Timestamps handle any timezone, only datetimes used as cache keys need a conversion
+        to UTC. Like in _datetime_in_utc() a naive datetime is taken as local time
+        :param dt: datetime or None
+        :return:   datetime
+        """
+        if dt is None:
+            return datetime.datetime.now(_UTC)
+        return dt
+
     def _datetime_in_utc(self, dt):
-        if dt is not None:
-            return dt.astimezone(datetime.UTC)
-        else:
-            return datetime.datetime.now(datetime.UTC)
+        """
+        Return dt converted to UTC, the current time is only read when no dt is given
+        :param dt: datetime or None, a naive datetime is taken as local time
+        :return:   timezone aware datetime in UTC
+        """
+        if dt is None:
+            return datetime.datetime.now(_UTC)
+        if dt.tzinfo is _UTC:
+            return dt
+        return dt.astimezone(_UTC)
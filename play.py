@@ -5,6 +5,9 @@ from orb_sky import Orb as SkyfieldOrb  # Importiere die skyfield-basierte Klass
 
 import logging
 import datetime
+import sys
+
+import numpy
 
 
 logger = logging.getLogger(__name__)
@@ -39,18 +42,23 @@ skyfield_orb_moon = SkyfieldOrb('moon', lon, lat, elev)
 start_date = datetime.datetime(2023, 6, 1, tzinfo=TIMEZONE)
 delta = datetime.timedelta(hours=1)  # Jede Stunde testen
 
+# Skyfield berechnet alle 200 Aufgänge mit einer einzigen Suche
+skyfield_rises = skyfield_orb_sun.rise_batch([start_date + i * delta for i in range(200)])
+
+diffs = numpy.empty(200)
+lines = []
 current_time = start_date
 for i in range(200):  # 200 Zeitpunkte
     ephem_rise = ephem_orb_sun.rise(dt=current_time)
-    skyfield_rise = skyfield_orb_sun.rise(dt=current_time)
+    skyfield_rise = skyfield_rises[i]
     ephem_rise2 = ephem_rise.astimezone(TIMEZONE)
     skyfield_rise2 = skyfield_rise.astimezone(TIMEZONE)
 
-    print("CT: " + str(i))
-    print("sky: " + str(skyfield_rise2))
-    print("emp: " + str(ephem_rise2))
     ##self.compare_times(ephem_rise, skyfield_rise)
-    diff = abs((ephem_rise - skyfield_rise).total_seconds())
-    print(diff)
-    print("")
-    current_time += delta
\ No newline at end of file
+    diffs[i] = abs((ephem_rise - skyfield_rise).total_seconds())
+    lines.append(f"CT: {i}\nsky: {skyfield_rise2}\nemp: {ephem_rise2}\n{diffs[i]}\n")
+    current_time += delta
+
+# Ausgabe gesammelt schreiben statt 800 einzelner print-Aufrufe
+sys.stdout.write("\n".join(lines) + "\n")
+print(f"diff mean: {diffs.mean()} s, max: {diffs.max()} s")
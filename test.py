@@ -1,37 +1,94 @@
 import unittest
 import datetime
+import os
+import subprocess
+import sys
+import numpy
 from zoneinfo import ZoneInfo  # Für Zeitzonenunterstützung (Python 3.9+)
 from orb_eph import Orb as EphemOrb  # Importiere die ephem-basierte Klasse
 from orb_sky import Orb as SkyfieldOrb  # Importiere die skyfield-basierte Klasse
 
+# Die Tests sind unabhängig voneinander und können mit pytest-xdist parallel laufen:
+#   python -m pytest -n auto test.py
+
 # Zeitzone GMT+1 (CET)
 TIMEZONE = ZoneInfo("Europe/Berlin")
 
 
+def _timestamps(times):
+    """
+    Wandelt eine Liste von datetime-Objekten in ein numpy-Array von Unix-Zeitstempeln um.
+    """
+    return numpy.fromiter((t.timestamp() for t in times), dtype=float, count=len(times))
+
+
+def _time_schedule(ts, start, delta, n):
+    """
+    Erzeugt n Zeitpunkte im Abstand delta ab start direkt als ein Skyfield-Zeitarray,
+    ohne dafür einzelne datetime-Objekte anzulegen.
+    """
+    seconds = start.timestamp() + numpy.arange(n) * delta.total_seconds()
+    # in ganze Tage aufteilen, damit Schaltsekunden für den richtigen Tag berücksichtigt werden
+    days, seconds = numpy.divmod(seconds, 86400.0)
+    return ts.utc(1970, 1, 1 + days, 0, 0, seconds)
+
+
+def _datetime_schedule(start, delta, n):
+    """
+    Erzeugt dieselben Zeitpunkte wie _time_schedule als datetime-Objekte. Gerechnet wird in UTC,
+    damit die Abstände auch über eine Zeitumstellung hinweg gleich lang bleiben.
+    """
+    start = start.astimezone(datetime.timezone.utc)
+    return [start + i * delta for i in range(n)]
+
+
+def _check_tol(a, b, tolerance_seconds):
+    """
+    Vergleicht zwei Arrays von Zeitstempeln elementweise wie compare_times, eine Abweichung
+    von einem Tag innerhalb der Toleranz gilt ebenfalls als Treffer.
+    :return: Array mit True für jeden Zeitpunkt innerhalb der Toleranz
+    """
+    delta = numpy.abs(a - b)
+    delta_day = numpy.abs(delta - 86400.0)
+    delta = numpy.where(delta_day < tolerance_seconds, delta_day, delta)
+    return delta <= tolerance_seconds
+
+
 class TestOrb(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Initialisiere beide Klassen mit denselben Parametern.
+        Initialisiere beide Klassen mit denselben Parametern, einmal für alle Tests.
         """
-        self.lat = 52.5200  # Berlin
-        self.lon = 13.4050
-        self.elev = 49  # Meter über dem Meeresspiegel
+        cls.lat = 52.5200  # Berlin
+        cls.lon = 13.4050
+        cls.elev = 49  # Meter über dem Meeresspiegel
 
         # Initialisiere beide Implementierungen
-        self.ephem_orb_sun = EphemOrb('sun', self.lon, self.lat, self.elev)
-        self.skyfield_orb_sun = SkyfieldOrb('sun', self.lon, self.lat, self.elev)
+        cls.ephem_orb_sun = EphemOrb('sun', cls.lon, cls.lat, cls.elev)
+        cls.skyfield_orb_sun = SkyfieldOrb('sun', cls.lon, cls.lat, cls.elev)
+
+        cls.ephem_orb_moon = EphemOrb('moon', cls.lon, cls.lat, cls.elev)
+        cls.skyfield_orb_moon = SkyfieldOrb('moon', cls.lon, cls.lat, cls.elev)
 
-        self.ephem_orb_moon = EphemOrb('moon', self.lon, self.lat, self.elev)
-        self.skyfield_orb_moon = SkyfieldOrb('moon', self.lon, self.lat, self.elev)
+        # Stündliche Zeitpunkte, einmal erzeugt und von mehreren Tests verwendet
+        hour = datetime.timedelta(hours=1)
+        start_january = datetime.datetime(2023, 1, 1, tzinfo=TIMEZONE)
+        start_june = datetime.datetime(2023, 6, 1, tzinfo=TIMEZONE)
+        cls._hourly_times_january = _datetime_schedule(start_january, hour, 200)
+        cls._hourly_times_june = _datetime_schedule(start_june, hour, 200)
+        # dieselben Zeitpunkte als Skyfield-Zeitarrays für die Batch-Methoden
+        cls._hourly_tarray_january = _time_schedule(cls.skyfield_orb_sun.ts, start_january, hour, 200)
+        cls._hourly_tarray_june = _time_schedule(cls.skyfield_orb_sun.ts, start_june, hour, 200)
 
     def compare_times(self, time1, time2, tolerance_seconds=60):
         """
-        Vergleicht zwei datetime-Objekte und prüft, ob sie innerhalb einer Toleranz liegen.
-        :param time1: Erstes datetime-Objekt
-        :param time2: Zweites datetime-Objekt
+        Vergleicht zwei Zeitpunkte und prüft, ob sie innerhalb einer Toleranz liegen.
+        :param time1: Erster Zeitpunkt als Unix-Zeitstempel
+        :param time2: Zweiter Zeitpunkt als Unix-Zeitstempel
         :param tolerance_seconds: Toleranz in Sekunden
         """
-        delta = abs((time1 - time2).total_seconds())
+        delta = abs(time1 - time2)
         delta2 = delta
         if (abs(delta - 86400)) < tolerance_seconds:
             delta2 = abs(delta - 86400)
@@ -41,16 +98,76 @@ class TestOrb(unittest.TestCase):
         """
         Testet die noon-Methode für die Sonne mit 200 Zeitpunkten.
         """
-        start_date = datetime.datetime(2023, 1, 1, tzinfo=TIMEZONE)
-        delta = datetime.timedelta(hours=1)  # Jede Stunde testen
-
-        current_time = start_date
-        for i in range(1):  # 200 Zeitpunkte
+        for current_time in self._hourly_times_january[:1]:
             with self.subTest(time=current_time):
                 ephem_noon = self.ephem_orb_sun.noon(dt=current_time)
                 skyfield_noon = self.skyfield_orb_sun.noon(dt=current_time)
-                self.compare_times(ephem_noon, skyfield_noon,600)
-            current_time += delta
+                self.compare_times(ephem_noon.timestamp(), skyfield_noon.timestamp(), 600)
+
+    def test_noon_midnight_utc(self):
+        """
+        Testet, dass noon und midnight von Skyfield direkt in UTC zurückgegeben werden.
+        """
+        current_time = datetime.datetime(2023, 1, 1, tzinfo=TIMEZONE)
+        self.assertIs(self.skyfield_orb_sun.noon(dt=current_time).tzinfo, datetime.timezone.utc)
+        self.assertIs(self.skyfield_orb_sun.midnight(dt=current_time).tzinfo, datetime.timezone.utc)
+
+    def test_pos_ambiguous_hour(self):
+        """
+        Testet pos in der doppelten Stunde am Ende der Sommerzeit, beide Zeitpunkte
+        unterscheiden sich nur in fold und dürfen sich keinen Cache-Eintrag teilen.
+        """
+        first = datetime.datetime(2023, 10, 29, 2, 30, tzinfo=TIMEZONE, fold=0)
+        second = datetime.datetime(2023, 10, 29, 2, 30, tzinfo=TIMEZONE, fold=1)
+        first_pos = self.skyfield_orb_sun.pos(dt=first, degree=True)
+        second_pos = self.skyfield_orb_sun.pos(dt=second, degree=True)
+        expected_az, expected_alt = self.skyfield_orb_sun.pos_batch([first, second], degree=True)
+        for i, pos in enumerate((first_pos, second_pos)):
+            self.assertAlmostEqual(pos[0], expected_az[i], delta=0.001, msg="Azimut stimmt nicht überein")
+            self.assertAlmostEqual(pos[1], expected_alt[i], delta=0.001, msg="Höhe stimmt nicht überein")
+
+    def test_naive_datetime(self):
+        """
+        Testet, dass alle Methoden naive Zeitpunkte gleichermaßen als lokale Zeit annehmen.
+        """
+        aware = self._hourly_times_june[0].astimezone()  # lokale Zeitzone des Systems
+        naive = aware.replace(tzinfo=None)
+        self.assertEqual(self.skyfield_orb_sun.pos(dt=naive), self.skyfield_orb_sun.pos(dt=aware))
+        self.assertEqual(self.skyfield_orb_sun.rise(dt=naive), self.skyfield_orb_sun.rise(dt=aware))
+        self.assertEqual(self.skyfield_orb_moon._light(dt=naive), self.skyfield_orb_moon._light(dt=aware))
+        self.assertEqual(self.skyfield_orb_moon._phase(dt=naive), self.skyfield_orb_moon._phase(dt=aware))
+
+    def test_skyfield_subclass(self):
+        """
+        Testet, dass auch eine Unterklasse von Orb als erste Instanz die Skyfield-Daten laden kann.
+        """
+        # in diesem Prozess sind die Daten schon geladen, daher in einem frischen Interpreter prüfen
+        code = (
+            "import orb_sky\n"
+            "class SubclassOrb(orb_sky.Orb):\n"
+            "    pass\n"
+            f"orb = SubclassOrb('sun', {self.lon}, {self.lat}, {self.elev})\n"
+            "assert orb.planets is orb_sky.Orb('moon', 0, 0).planets\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_ephem_neverup_cache_moff(self):
+        """
+        Testet, dass der Cache in _avoid_neverup kein Extremum für eine Abfrage mit anderem moff
+        wiederverwendet, das Ergebnis muss dem einer frischen Instanz entsprechen.
+        """
+        moon = EphemOrb('moon', 13.4, 52.5)
+        moon.rise(doff=-20, dt=datetime.datetime(2023, 2, 28, 12, tzinfo=TIMEZONE))
+        dt = datetime.datetime(2023, 3, 1, 10, tzinfo=TIMEZONE)
+        results = []
+        for orb in (moon, EphemOrb('moon', 13.4, 52.5)):
+            try:
+                results.append(orb.rise(doff=-20, moff=600, dt=dt))
+            except Exception as e:
+                results.append(type(e).__name__)
+        self.assertEqual(results[0], results[1])
 
     # def test_midnight_200_timepoints(self):
     #     """
@@ -64,43 +181,59 @@ class TestOrb(unittest.TestCase):
     #         with self.subTest(time=current_time):
     #             ephem_midnight = self.ephem_orb_sun.midnight(dt=current_time)
     #             skyfield_midnight = self.skyfield_orb_sun.midnight(dt=current_time)
-    #             ephem_midnight2 = ephem_midnight.astimezone(TIMEZONE)
-    #             skyfield_midnight2 = skyfield_midnight.astimezone(TIMEZONE)
-    #             self.compare_times(ephem_midnight, skyfield_midnight)
+    #             self.compare_times(ephem_midnight.timestamp(), skyfield_midnight.timestamp())
     #         current_time += delta
 
     def test_rise_200_timepoints(self):
         """
         Testet die rise-Methode für die Sonne mit 200 Zeitpunkten.
         """
-        start_date = datetime.datetime(2023, 6, 1, tzinfo=TIMEZONE)
-        delta = datetime.timedelta(hours=1)  # Jede Stunde testen
+        # Skyfield berechnet alle 200 Aufgänge mit einer einzigen Suche
+        skyfield_rises = self.skyfield_orb_sun.rise_batch(self._hourly_tarray_june, doff=0)
 
-        current_time = start_date
-        for i in range(200):  # 200 Zeitpunkte
-            with self.subTest(time=current_time):
-                noon = self.ephem_orb_sun.noon(dt=current_time).astimezone(TIMEZONE)
-                ephem_rise = self.ephem_orb_sun.rise(dt=current_time, doff=0)
-                skyfield_rise = self.skyfield_orb_sun.rise_cached(dt=current_time, doff=0)
-                ephem_rise2 = ephem_rise.astimezone(TIMEZONE)
-                skyfield_rise2 = skyfield_rise.astimezone(TIMEZONE)
-                self.compare_times(ephem_rise, skyfield_rise, 600)
-            current_time += delta
+        ephem_rises = []
+        cached_rises = []
+        for current_time in self._hourly_times_june:  # 200 Zeitpunkte
+            ephem_rises.append(self.ephem_orb_sun.rise(dt=current_time, doff=0))
+            cached_rises.append(self.skyfield_orb_sun.rise_cached(dt=current_time, doff=0))
+
+        # gecachte und Batch-Berechnung von Skyfield müssen übereinstimmen
+        within = _check_tol(_timestamps(cached_rises), _timestamps(skyfield_rises), 1)
+        failed = [self._hourly_times_june[i] for i in numpy.flatnonzero(~within)]
+        self.assertTrue(within.all(), f"rise_cached weicht ab für {failed}")
+
+        # ephem und Skyfield für alle Zeitpunkte auf einmal vergleichen
+        within = _check_tol(_timestamps(ephem_rises), _timestamps(skyfield_rises), 600)
+        failed = [self._hourly_times_june[i] for i in numpy.flatnonzero(~within)]
+        self.assertTrue(within.all(), f"Zeitdifferenz zu groß für {failed}")
 
     def test_set_200_timepoints(self):
         """
         Testet die set-Methode für die Sonne mit 200 Zeitpunkten.
         """
-        start_date = datetime.datetime(2023, 6, 1, tzinfo=TIMEZONE)
-        delta = datetime.timedelta(hours=1)  # Jede Stunde testen
+        # Skyfield berechnet alle 200 Untergänge mit einer einzigen Suche
+        skyfield_sets = self.skyfield_orb_sun.set_batch(self._hourly_tarray_june)
 
-        current_time = start_date
-        for i in range(200):  # 200 Zeitpunkte
-            with self.subTest(time=current_time):
-                ephem_set = self.ephem_orb_sun.set(dt=current_time)
-                skyfield_set = self.skyfield_orb_sun.set(dt=current_time)
-                self.compare_times(ephem_set, skyfield_set,600)
-            current_time += delta
+        ephem_sets = []
+        scalar_sets = []
+        cached_sets = []
+        for current_time in self._hourly_times_june:  # 200 Zeitpunkte
+            ephem_sets.append(self.ephem_orb_sun.set(dt=current_time))
+            scalar_sets.append(self.skyfield_orb_sun.set(dt=current_time))
+            cached_sets.append(self.skyfield_orb_sun.set_cached(dt=current_time))
+
+        # einzelne, gecachte und Batch-Berechnung von Skyfield müssen übereinstimmen
+        within = _check_tol(_timestamps(scalar_sets), _timestamps(skyfield_sets), 1)
+        failed = [self._hourly_times_june[i] for i in numpy.flatnonzero(~within)]
+        self.assertTrue(within.all(), f"set weicht ab für {failed}")
+        within = _check_tol(_timestamps(cached_sets), _timestamps(skyfield_sets), 1)
+        failed = [self._hourly_times_june[i] for i in numpy.flatnonzero(~within)]
+        self.assertTrue(within.all(), f"set_cached weicht ab für {failed}")
+
+        # ephem und Skyfield für alle Zeitpunkte auf einmal vergleichen
+        within = _check_tol(_timestamps(ephem_sets), _timestamps(skyfield_sets), 600)
+        failed = [self._hourly_times_june[i] for i in numpy.flatnonzero(~within)]
+        self.assertTrue(within.all(), f"Zeitdifferenz zu groß für {failed}")
 
     def test_moon_phase_200_timepoints(self):
         """
@@ -108,45 +241,75 @@ class TestOrb(unittest.TestCase):
         """
         start_date = datetime.datetime(2023, 1, 1, tzinfo=TIMEZONE)
         delta = datetime.timedelta(hours=2)  # Alle zwei Stunden testen
+        times = _datetime_schedule(start_date, delta, 200)  # 200 Zeitpunkte
 
-        current_time = start_date
-        for i in range(200):  # 200 Zeitpunkte
-            with self.subTest(time=current_time):
-                ephem_phase = self.ephem_orb_moon._phase()
-                skyfield_phase = self.skyfield_orb_moon._phase()
-                self.assertEqual(ephem_phase, skyfield_phase, "Mondphasen stimmen nicht überein")
-            current_time += delta
+        # Skyfield berechnet alle 200 Mondphasen mit einem einzigen Aufruf
+        skyfield_phases = self.skyfield_orb_moon.phase_batch(_time_schedule(self.skyfield_orb_moon.ts, start_date, delta, 200))
+
+        mismatches = []
+        scalar_mismatches = []
+        for i, current_time in enumerate(times):
+            ephem_phase = self.ephem_orb_moon._phase(dt=current_time)
+            skyfield_phase = skyfield_phases[i]
+            # die Zeitpunkte liegen auf vollen Stunden, die Rundung auf Minuten ändert hier nichts
+            scalar_phase = self.skyfield_orb_moon._phase(dt=current_time)
+            if scalar_phase != skyfield_phase:
+                scalar_mismatches.append((current_time, scalar_phase, skyfield_phase))
+            # ephem zählt die Zeit seit Neumond, Skyfield den Winkel zwischen Mond und Sonne,
+            # an den Grenzen der Achtel können die Phasen daher um eins abweichen
+            if abs(ephem_phase - skyfield_phase) > 1:
+                mismatches.append((current_time, ephem_phase, skyfield_phase))
+        self.assertFalse(scalar_mismatches, f"_phase weicht von phase_batch ab: {scalar_mismatches}")
+        self.assertFalse(mismatches, f"Mondphasen stimmen nicht überein: {mismatches}")
 
     def test_moon_light_200_timepoints(self):
         """
         Testet die _light-Methode für den Mond mit 200 Zeitpunkten.
         """
         start_date = datetime.datetime(2023, 3, 1, tzinfo=TIMEZONE)
-        delta = datetime.timedelta(hours=23)  # Alle 3 Stunden testen
+        delta = datetime.timedelta(hours=23)  # Alle 23 Stunden testen
+        times = _datetime_schedule(start_date, delta, 200)  # 200 Zeitpunkte
 
-        current_time = start_date
-        for i in range(200):  # 200 Zeitpunkte
-            with self.subTest(time=current_time):
-                ephem_light = self.ephem_orb_moon._light()
-                skyfield_light = self.skyfield_orb_moon._light()
-                self.assertAlmostEqual(ephem_light, skyfield_light, delta= 1, msg="Mondbeleuchtung stimmt nicht überein")
-            current_time += delta
+        # Skyfield berechnet alle 200 Beleuchtungen mit einem einzigen Aufruf
+        skyfield_lights = self.skyfield_orb_moon.light_batch(_time_schedule(self.skyfield_orb_moon.ts, start_date, delta, 200))
+
+        mismatches = []
+        scalar_mismatches = []
+        for i, current_time in enumerate(times):
+            ephem_light = self.ephem_orb_moon._light(dt=current_time)
+            skyfield_light = skyfield_lights[i]
+            # die Zeitpunkte liegen auf vollen Stunden, die Rundung auf Minuten ändert hier nichts
+            scalar_light = self.skyfield_orb_moon._light(dt=current_time)
+            if scalar_light != skyfield_light:
+                scalar_mismatches.append((current_time, scalar_light, skyfield_light))
+            if abs(ephem_light - skyfield_light) > 1:
+                mismatches.append((current_time, ephem_light, skyfield_light))
+        self.assertFalse(scalar_mismatches, f"_light weicht von light_batch ab: {scalar_mismatches}")
+        self.assertFalse(mismatches, f"Mondbeleuchtung stimmt nicht überein: {mismatches}")
 
     def test_sun_pos_200_timepoints(self):
         """
         Testet die pos-Methode für die Sonne mit 200 Zeitpunkten.
         """
-        start_date = datetime.datetime(2023, 1, 1, tzinfo=TIMEZONE)
-        delta = datetime.timedelta(hours=1)  # Jede Stunde testen
+        # Skyfield berechnet alle 200 Positionen mit einem einzigen Aufruf
+        skyfield_az, skyfield_alt = self.skyfield_orb_sun.pos_batch(self._hourly_tarray_january, degree=True)
 
-        current_time = start_date
-        for i in range(200):  # 200 Zeitpunkte
-            with self.subTest(time=current_time):
-                ephem_pos = self.ephem_orb_sun.pos(dt=current_time, degree=True)
-                skyfield_pos = self.skyfield_orb_sun.pos(dt=current_time, degree=True)
-                #self.assertAlmostEqual(ephem_pos[0], skyfield_pos[0], delta=1, msg="Azimut stimmt nicht überein")
-                #self.assertAlmostEqual(ephem_pos[1], skyfield_pos[1], delta=1, msg="Höhe stimmt nicht überein")
-            current_time += delta
+        ephem_mismatches = []
+        scalar_mismatches = []
+        for i, current_time in enumerate(self._hourly_times_january):  # 200 Zeitpunkte
+            ephem_pos = self.ephem_orb_sun.pos(dt=current_time, degree=True)
+            skyfield_pos = (skyfield_az[i], skyfield_alt[i])
+            # ephem berücksichtigt die Refraktion, die Höhe weicht daher um etwa ein Grad ab,
+            # verglichen wird nur der Azimut, auch über den Sprung bei 360° hinweg
+            az_delta = abs((ephem_pos[0] - skyfield_pos[0] + 180) % 360 - 180)
+            if az_delta > 0.01:
+                ephem_mismatches.append((current_time, ephem_pos[0], skyfield_pos[0]))
+            # einzelne und Batch-Berechnung von Skyfield müssen übereinstimmen
+            scalar_pos = self.skyfield_orb_sun.pos(dt=current_time, degree=True)
+            if abs(scalar_pos[0] - skyfield_pos[0]) > 0.001 or abs(scalar_pos[1] - skyfield_pos[1]) > 0.001:
+                scalar_mismatches.append((current_time, scalar_pos, skyfield_pos))
+        self.assertFalse(scalar_mismatches, f"pos weicht von pos_batch ab: {scalar_mismatches}")
+        self.assertFalse(ephem_mismatches, f"Azimut stimmt nicht überein: {ephem_mismatches}")
 
 
 if __name__ == '__main__':